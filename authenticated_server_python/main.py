@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
+import logging
 import os
-from copy import deepcopy
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping
 from urllib.parse import urlparse
 
 import mcp.types as types
@@ -16,7 +17,7 @@ from mcp.server.transport_security import TransportSecuritySettings
 from mcp.shared.auth import ProtectedResourceMetadata
 from dotenv import load_dotenv
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 
 
 @dataclass(frozen=True)
@@ -33,6 +34,11 @@ class PizzazWidget:
 ROOT_DIR = Path(__file__).resolve().parent
 load_dotenv(ROOT_DIR / ".env")
 
+logger = logging.getLogger(__name__)
+if os.getenv("MCP_DEBUG"):
+    logging.basicConfig()
+    logger.setLevel(logging.DEBUG)
+
 ASSETS_DIR = ROOT_DIR.parent / "assets"
 
 
@@ -42,9 +48,9 @@ def _load_widget_html(component_name: str) -> str:
     if html_path.exists():
         return html_path.read_text(encoding="utf8")
 
-    fallback_candidates = sorted(ASSETS_DIR.glob(f"{component_name}-*.html"))
-    if fallback_candidates:
-        return fallback_candidates[-1].read_text(encoding="utf8")
+    fallback_candidate = max(ASSETS_DIR.glob(f"{component_name}-*.html"), default=None)
+    if fallback_candidate is not None:
+        return fallback_candidate.read_text(encoding="utf8")
 
     raise FileNotFoundError(
         f'Widget HTML for "{component_name}" not found in {ASSETS_DIR}. '
@@ -78,7 +84,8 @@ MIME_TYPE = "text/html+skybridge"
 SEARCH_TOOL_NAME = SEARCH_WIDGET.identifier
 PAST_ORDERS_TOOL_NAME = "see_past_orders"
 
-SEARCH_TOOL_SCHEMA: Dict[str, Any] = {
+# Input schemas are shared with the prebuilt tool listings; treat them as read-only.
+SEARCH_TOOL_SCHEMA: Final[Dict[str, Any]] = {
     "type": "object",
     "title": "Search terms",
     "properties": {
@@ -91,7 +98,7 @@ SEARCH_TOOL_SCHEMA: Dict[str, Any] = {
     "additionalProperties": False,
 }
 
-PAST_ORDERS_TOOL_SCHEMA: Dict[str, Any] = {
+PAST_ORDERS_TOOL_SCHEMA: Final[Dict[str, Any]] = {
     "type": "object",
     "title": "Past orders",
     "properties": {
@@ -106,7 +113,7 @@ PAST_ORDERS_TOOL_SCHEMA: Dict[str, Any] = {
     "additionalProperties": False,
 }
 
-PAST_ORDERS_DATA = [
+PAST_ORDERS_DATA = (
     {
         "orderId": "pz-4931",
         "restaurantName": "Nova Slice Lab",
@@ -143,7 +150,7 @@ PAST_ORDERS_DATA = [
         "placedAt": "Aug 12, 7:45 PM",
         "location": "SoMa",
     },
-]
+)
 
 AUTHORIZATION_SERVER_URL = os.getenv("AUTHORIZATION_SERVER_URL")
 RESOURCE_SERVER_URL = os.getenv("RESOURCE_SERVER_URL")
@@ -163,8 +170,8 @@ if missing_env:
         + ". Set them in authenticated_server_python/.env."
     )
 
-print("AUTHORIZATION_SERVER_URL", AUTHORIZATION_SERVER_URL)
-print("RESOURCE_SERVER_URL", RESOURCE_SERVER_URL)
+logger.debug("AUTHORIZATION_SERVER_URL %s", AUTHORIZATION_SERVER_URL)
+logger.debug("RESOURCE_SERVER_URL %s", RESOURCE_SERVER_URL)
 RESOURCE_SCOPES = []
 
 _parsed_resource_url = urlparse(str(RESOURCE_SERVER_URL))
@@ -176,12 +183,16 @@ PROTECTED_RESOURCE_METADATA_PATH = (
 )
 PROTECTED_RESOURCE_METADATA_URL = f"{_parsed_resource_url.scheme}://{_parsed_resource_url.netloc}{PROTECTED_RESOURCE_METADATA_PATH}"
 
-print("PROTECTED_RESOURCE_METADATA_URL", PROTECTED_RESOURCE_METADATA_URL)
+logger.debug("PROTECTED_RESOURCE_METADATA_URL %s", PROTECTED_RESOURCE_METADATA_URL)
 PROTECTED_RESOURCE_METADATA = ProtectedResourceMetadata(
     resource=RESOURCE_SERVER_URL,
     authorization_servers=[AUTHORIZATION_SERVER_URL],
     scopes_supported=RESOURCE_SCOPES,
 )
+# The metadata never changes at runtime, so serialize the response body once.
+PROTECTED_RESOURCE_METADATA_BODY = (
+    PROTECTED_RESOURCE_METADATA.model_dump_json().encode()
+)
 
 # Tool-level securitySchemes inform ChatGPT when OAuth is required for a call.
 MIXED_TOOL_SECURITY_SCHEMES = [
@@ -225,14 +236,22 @@ mcp = FastMCP(
 )
 
 
+# Precomputed WWW-Authenticate pieces for the standard OAuth error codes; only the
+# description needs escaping per call.
+WWW_AUTHENTICATE_PREFIXES: Dict[str, str] = {
+    error: f'Bearer error="{error}"error_description="'
+    for error in ("invalid_request", "invalid_token", "insufficient_scope")
+}
+WWW_AUTHENTICATE_SUFFIX = f'", resource_metadata="{PROTECTED_RESOURCE_METADATA_URL}"'
+
+
 def _build_www_authenticate_value(error: str, description: str) -> str:
-    safe_error = error.replace('"', r"\"")
+    prefix = WWW_AUTHENTICATE_PREFIXES.get(error)
+    if prefix is None:
+        safe_error = error.replace('"', r"\"")
+        prefix = f'Bearer error="{safe_error}"error_description="'
     safe_description = description.replace('"', r"\"")
-    parts = [
-        f'error="{safe_error}"error_description="{safe_description}"',
-    ]
-    parts.append(f'resource_metadata="{PROTECTED_RESOURCE_METADATA_URL}"')
-    return f"Bearer {', '.join(parts)}"
+    return prefix + safe_description + WWW_AUTHENTICATE_SUFFIX
 
 
 def _oauth_error_result(
@@ -260,16 +279,11 @@ def _oauth_error_result(
     )
 
 
-def _get_bearer_token_from_request() -> str | None:
-    try:
-        request_context = mcp._mcp_server.request_context
-    except LookupError:
-        return None
+AUTHORIZATION_HEADER_KEY = b"authorization"
 
-    request = getattr(request_context, "request", None)
-    if request is None:
-        return None
 
+def _authorization_from_request(request: Any) -> Any:
+    """Authorization lookup for request objects that aren't Starlette requests."""
     header_value: Any = None
     headers = getattr(request, "headers", None)
     if headers is not None:
@@ -285,18 +299,10 @@ def _get_bearer_token_from_request() -> str | None:
         scope = getattr(request, "scope", None)
         scope_headers = scope.get("headers") if isinstance(scope, dict) else None
         if scope_headers:
+            # ASGI header names and values are always bytes, so compare raw keys.
             for key, value in scope_headers:
-                decoded_key = (
-                    key.decode("latin-1")
-                    if isinstance(key, (bytes, bytearray))
-                    else str(key)
-                ).lower()
-                if decoded_key == "authorization":
-                    header_value = (
-                        value.decode("latin-1")
-                        if isinstance(value, (bytes, bytearray))
-                        else str(value)
-                    )
+                if key.lower() == AUTHORIZATION_HEADER_KEY:
+                    header_value = value.decode("latin-1")
                     break
 
     if header_value is None and isinstance(request, dict):
@@ -304,6 +310,24 @@ def _get_bearer_token_from_request() -> str | None:
         raw_value = request.get("authorization") or request.get("Authorization")
         header_value = raw_value
 
+    return header_value
+
+
+def _get_bearer_token_from_request() -> str | None:
+    try:
+        request = mcp._mcp_server.request_context.request
+    except (LookupError, AttributeError):
+        return None
+
+    if request is None:
+        return None
+
+    if isinstance(request, Request):
+        # Common case: Starlette headers are already indexed case-insensitively.
+        header_value: Any = request.headers.get("authorization")
+    else:
+        header_value = _authorization_from_request(request)
+
     if header_value is None:
         return None
 
@@ -311,7 +335,8 @@ def _get_bearer_token_from_request() -> str | None:
         header_value = header_value.decode("latin-1")
 
     header_value = header_value.strip()
-    if not header_value.lower().startswith("bearer "):
+    # Only lowercase the scheme prefix; tokens can be long.
+    if header_value[:7].lower() != "bearer ":
         return None
 
     token = header_value[7:].strip()
@@ -323,7 +348,7 @@ async def protected_resource_metadata(request: Request) -> Response:
     """Expose RFC 9728 metadata so clients can find the Auth0 authorization server."""
     if request.method == "OPTIONS":
         return Response(status_code=204)
-    return JSONResponse(PROTECTED_RESOURCE_METADATA.model_dump(mode="json"))
+    return Response(PROTECTED_RESOURCE_METADATA_BODY, media_type="application/json")
 
 
 def _resource_description(widget: PizzazWidget) -> str:
@@ -341,16 +366,20 @@ def _tool_meta(
         "openai/widgetAccessible": True,
     }
     if security_schemes is not None:
-        meta["securitySchemes"] = deepcopy(security_schemes)
+        meta["securitySchemes"] = security_schemes
     return meta
 
 
-def _tool_invocation_meta(widget: PizzazWidget) -> Dict[str, Any]:
-    return {
-        "openai/toolInvocation/invoking": widget.invoking,
-        "openai/toolInvocation/invoked": widget.invoked,
-        "openai/widgetSessionId": "ren-test-session-id",
-    }
+# Cached per widget; the read-only view keeps callers from mutating the shared dict.
+@lru_cache(maxsize=None)
+def _tool_invocation_meta(widget: PizzazWidget) -> Mapping[str, Any]:
+    return MappingProxyType(
+        {
+            "openai/toolInvocation/invoking": widget.invoking,
+            "openai/toolInvocation/invoked": widget.invoked,
+            "openai/widgetSessionId": "ren-test-session-id",
+        }
+    )
 
 
 def _tool_error(message: str) -> types.ServerResult:
@@ -362,93 +391,99 @@ def _tool_error(message: str) -> types.ServerResult:
     )
 
 
+TOOLS: List[types.Tool] = [
+    types.Tool(
+        name=SEARCH_TOOL_NAME,
+        title=SEARCH_WIDGET.title,
+        description=(
+            "Search for pizza shops in San Francisco (optionally filter by toppings)."
+        ),
+        inputSchema=SEARCH_TOOL_SCHEMA,
+        _meta=_tool_meta(SEARCH_WIDGET, MIXED_TOOL_SECURITY_SCHEMES),
+        securitySchemes=list(MIXED_TOOL_SECURITY_SCHEMES),
+        # To disable the approval prompt for the tools
+        annotations={
+            "destructiveHint": False,
+            "openWorldHint": False,
+            "readOnlyHint": True,
+        },
+    ),
+    types.Tool(
+        name=PAST_ORDERS_TOOL_NAME,
+        title="See past orders",
+        description="Return a list of past pizza orders (OAuth required).",
+        inputSchema=PAST_ORDERS_TOOL_SCHEMA,
+        _meta=_tool_meta(PAST_ORDERS_WIDGET, OAUTH_ONLY_SECURITY_SCHEMES),
+        securitySchemes=list(OAUTH_ONLY_SECURITY_SCHEMES),
+        annotations={
+            "destructiveHint": False,
+            "openWorldHint": False,
+            "readOnlyHint": True,
+        },
+    ),
+]
+
+RESOURCES: List[types.Resource] = [
+    types.Resource(
+        name=widget.title,
+        title=widget.title,
+        uri=widget.template_uri,
+        description=_resource_description(widget),
+        mimeType=MIME_TYPE,
+        _meta=_tool_meta(widget),
+    )
+    for widget in (SEARCH_WIDGET, PAST_ORDERS_WIDGET)
+]
+
+RESOURCE_TEMPLATES: List[types.ResourceTemplate] = [
+    types.ResourceTemplate(
+        name=widget.title,
+        title=widget.title,
+        uriTemplate=widget.template_uri,
+        description=_resource_description(widget),
+        mimeType=MIME_TYPE,
+        _meta=_tool_meta(widget),
+    )
+    for widget in (SEARCH_WIDGET, PAST_ORDERS_WIDGET)
+]
+
+
+# The listings are static, so they are built once above and shared by every call.
 @mcp._mcp_server.list_tools()
 async def _list_tools() -> List[types.Tool]:
-    tool_meta = _tool_meta(SEARCH_WIDGET, MIXED_TOOL_SECURITY_SCHEMES)
-    past_orders_meta = _tool_meta(PAST_ORDERS_WIDGET, OAUTH_ONLY_SECURITY_SCHEMES)
-    return [
-        types.Tool(
-            name=SEARCH_TOOL_NAME,
-            title=SEARCH_WIDGET.title,
-            description=(
-                "Search for pizza shops in San Francisco (optionally filter by toppings)."
-            ),
-            inputSchema=SEARCH_TOOL_SCHEMA,
-            _meta=tool_meta,
-            securitySchemes=list(MIXED_TOOL_SECURITY_SCHEMES),
-            # To disable the approval prompt for the tools
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": False,
-                "readOnlyHint": True,
-            },
-        ),
-        types.Tool(
-            name=PAST_ORDERS_TOOL_NAME,
-            title="See past orders",
-            description="Return a list of past pizza orders (OAuth required).",
-            inputSchema=PAST_ORDERS_TOOL_SCHEMA,
-            _meta=past_orders_meta,
-            securitySchemes=list(OAUTH_ONLY_SECURITY_SCHEMES),
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": False,
-                "readOnlyHint": True,
-            },
-        ),
-    ]
+    return TOOLS
 
 
 @mcp._mcp_server.list_resources()
 async def _list_resources() -> List[types.Resource]:
-    return [
-        types.Resource(
-            name=SEARCH_WIDGET.title,
-            title=SEARCH_WIDGET.title,
-            uri=SEARCH_WIDGET.template_uri,
-            description=_resource_description(SEARCH_WIDGET),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(SEARCH_WIDGET),
-        ),
-        types.Resource(
-            name=PAST_ORDERS_WIDGET.title,
-            title=PAST_ORDERS_WIDGET.title,
-            uri=PAST_ORDERS_WIDGET.template_uri,
-            description=_resource_description(PAST_ORDERS_WIDGET),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(PAST_ORDERS_WIDGET),
-        ),
-    ]
+    return RESOURCES
 
 
 @mcp._mcp_server.list_resource_templates()
 async def _list_resource_templates() -> List[types.ResourceTemplate]:
-    return [
-        types.ResourceTemplate(
-            name=SEARCH_WIDGET.title,
-            title=SEARCH_WIDGET.title,
-            uriTemplate=SEARCH_WIDGET.template_uri,
-            description=_resource_description(SEARCH_WIDGET),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(SEARCH_WIDGET),
-        ),
-        types.ResourceTemplate(
-            name=PAST_ORDERS_WIDGET.title,
-            title=PAST_ORDERS_WIDGET.title,
-            uriTemplate=PAST_ORDERS_WIDGET.template_uri,
-            description=_resource_description(PAST_ORDERS_WIDGET),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(PAST_ORDERS_WIDGET),
-        ),
-    ]
+    return RESOURCE_TEMPLATES
+
+
+READ_RESOURCE_RESULTS: Dict[str, types.ServerResult] = {
+    widget.template_uri: types.ServerResult(
+        types.ReadResourceResult(
+            contents=[
+                types.TextResourceContents(
+                    uri=widget.template_uri,
+                    mimeType=MIME_TYPE,
+                    text=widget.html,
+                    _meta=_tool_meta(widget),
+                )
+            ]
+        )
+    )
+    for widget in (SEARCH_WIDGET, PAST_ORDERS_WIDGET)
+}
 
 
 async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerResult:
-    requested_uri = str(req.params.uri)
-    if requested_uri not in {
-        SEARCH_WIDGET.template_uri,
-        PAST_ORDERS_WIDGET.template_uri,
-    }:
+    result = READ_RESOURCE_RESULTS.get(str(req.params.uri))
+    if result is None:
         return types.ServerResult(
             types.ReadResourceResult(
                 contents=[],
@@ -456,22 +491,25 @@ async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerR
             )
         )
 
-    widget = (
-        SEARCH_WIDGET
-        if requested_uri == SEARCH_WIDGET.template_uri
-        else PAST_ORDERS_WIDGET
-    )
+    return result
 
-    contents = [
-        types.TextResourceContents(
-            uri=widget.template_uri,
-            mimeType=MIME_TYPE,
-            text=widget.html,
-            _meta=_tool_meta(widget),
-        )
-    ]
 
-    return types.ServerResult(types.ReadResourceResult(contents=contents))
+SEARCH_TEXT_CONTENT = types.TextContent(type="text", text=SEARCH_WIDGET.response_text)
+PAST_ORDERS_TEXT_CONTENT = types.TextContent(
+    type="text", text=PAST_ORDERS_WIDGET.response_text
+)
+
+# One prebuilt result per valid (clamped) past-orders limit.
+PAST_ORDERS_RESULTS: Dict[int, types.ServerResult] = {
+    limit: types.ServerResult(
+        types.CallToolResult(
+            content=[PAST_ORDERS_TEXT_CONTENT],
+            structuredContent={"orders": list(PAST_ORDERS_DATA[:limit])},
+            _meta=_tool_invocation_meta(PAST_ORDERS_WIDGET),
+        )
+    )
+    for limit in range(1, len(PAST_ORDERS_DATA) + 1)
+}
 
 
 async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
@@ -481,15 +519,13 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
 
     if tool_name == SEARCH_TOOL_NAME:
         meta = _tool_invocation_meta(SEARCH_WIDGET)
-        topping = str(arguments.get("searchTerm", "")).strip()
+        topping = arguments.get("searchTerm", "")
+        if not isinstance(topping, str):
+            topping = str(topping)
+        topping = topping.strip()
         return types.ServerResult(
             types.CallToolResult(
-                content=[
-                    types.TextContent(
-                        type="text",
-                        text="Rendered SF pizza search results!",
-                    )
-                ],
+                content=[SEARCH_TEXT_CONTENT],
                 structuredContent={"pizzaTopping": topping},
                 _meta=meta,
             )
@@ -502,26 +538,13 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
                 description="No access token was provided",
             )
 
-        meta = _tool_invocation_meta(PAST_ORDERS_WIDGET)
         limit = arguments.get("limit")
         try:
             parsed_limit = int(limit) if limit is not None else len(PAST_ORDERS_DATA)
         except Exception:
             parsed_limit = len(PAST_ORDERS_DATA)
         parsed_limit = max(1, min(parsed_limit, len(PAST_ORDERS_DATA)))
-        orders = PAST_ORDERS_DATA[:parsed_limit]
-        return types.ServerResult(
-            types.CallToolResult(
-                content=[
-                    types.TextContent(
-                        type="text",
-                        text=PAST_ORDERS_WIDGET.response_text,
-                    )
-                ],
-                structuredContent={"orders": orders},
-                _meta=meta,
-            )
-        )
+        return PAST_ORDERS_RESULTS[parsed_limit]
 
     return _tool_error(f"Unknown tool: {req.params.name}")
 
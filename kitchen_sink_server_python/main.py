@@ -48,9 +48,9 @@ def load_widget_html() -> str:
     if direct.exists():
         return direct.read_text(encoding="utf8")
 
-    candidates = sorted(ASSETS_DIR.glob("kitchen-sink-lite-*.html"))
-    if candidates:
-        return candidates[-1].read_text(encoding="utf8")
+    candidate = max(ASSETS_DIR.glob("kitchen-sink-lite-*.html"), default=None)
+    if candidate is not None:
+        return candidate.read_text(encoding="utf8")
 
     raise FileNotFoundError(
         f"Widget HTML for kitchen-sink-lite not found in {ASSETS_DIR}. "
@@ -58,6 +58,10 @@ def load_widget_html() -> str:
     )
 
 
+# Read the bundle at import so the first resource read doesn't block the event loop.
+WIDGET_HTML = load_widget_html()
+
+
 def tool_meta(invocation: str):
     return {
         "openai/outputTemplate": TEMPLATE_URI,
@@ -95,7 +99,7 @@ mcp = FastMCP(
 
 @mcp.resource(TEMPLATE_URI, "Kitchen sink lite widget", mime_type=MIME_TYPE)
 async def kitchen_sink_template() -> str:
-    return load_widget_html()
+    return WIDGET_HTML
 
 
 @mcp.tool()
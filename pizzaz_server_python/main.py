@@ -10,11 +10,11 @@ handlers into an HTTP/SSE stack so you can run the server with uvicorn on port
 from __future__ import annotations
 
 import os
-from copy import deepcopy
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping
 
 import mcp.types as types
 from mcp.server.fastmcp import FastMCP
@@ -42,9 +42,9 @@ def _load_widget_html(component_name: str) -> str:
     if html_path.exists():
         return html_path.read_text(encoding="utf8")
 
-    fallback_candidates = sorted(ASSETS_DIR.glob(f"{component_name}-*.html"))
-    if fallback_candidates:
-        return fallback_candidates[-1].read_text(encoding="utf8")
+    fallback_candidate = max(ASSETS_DIR.glob(f"{component_name}-*.html"), default=None)
+    if fallback_candidate is not None:
+        return fallback_candidate.read_text(encoding="utf8")
 
     raise FileNotFoundError(
         f'Widget HTML for "{component_name}" not found in {ASSETS_DIR}. '
@@ -110,6 +110,10 @@ WIDGETS_BY_ID: Dict[str, PizzazWidget] = {
 WIDGETS_BY_URI: Dict[str, PizzazWidget] = {
     widget.template_uri: widget for widget in widgets
 }
+RESPONSE_TEXT_CONTENTS: Dict[str, types.TextContent] = {
+    widget.identifier: types.TextContent(type="text", text=widget.response_text)
+    for widget in widgets
+}
 
 
 class PizzaInput(BaseModel):
@@ -149,7 +153,7 @@ mcp = FastMCP(
 )
 
 
-TOOL_INPUT_SCHEMA: Dict[str, Any] = {
+TOOL_INPUT_SCHEMA: Final[Dict[str, Any]] = {
     "type": "object",
     "properties": {
         "pizzaTopping": {
@@ -175,61 +179,72 @@ def _tool_meta(widget: PizzazWidget) -> Dict[str, Any]:
     }
 
 
-def _tool_invocation_meta(widget: PizzazWidget) -> Dict[str, Any]:
-    return {
-        "openai/toolInvocation/invoking": widget.invoking,
-        "openai/toolInvocation/invoked": widget.invoked,
-    }
+@lru_cache(maxsize=None)
+def _tool_invocation_meta(widget: PizzazWidget) -> Mapping[str, Any]:
+    return MappingProxyType(
+        {
+            "openai/toolInvocation/invoking": widget.invoking,
+            "openai/toolInvocation/invoked": widget.invoked,
+        }
+    )
+
+
+TOOLS: List[types.Tool] = [
+    types.Tool(
+        name=widget.identifier,
+        title=widget.title,
+        description=widget.title,
+        inputSchema=TOOL_INPUT_SCHEMA,
+        _meta=_tool_meta(widget),
+        # To disable the approval prompt for the tools
+        annotations={
+            "destructiveHint": False,
+            "openWorldHint": False,
+            "readOnlyHint": True,
+        },
+    )
+    for widget in widgets
+]
+
+RESOURCES: List[types.Resource] = [
+    types.Resource(
+        name=widget.title,
+        title=widget.title,
+        uri=widget.template_uri,
+        description=_resource_description(widget),
+        mimeType=MIME_TYPE,
+        _meta=_tool_meta(widget),
+    )
+    for widget in widgets
+]
 
+RESOURCE_TEMPLATES: List[types.ResourceTemplate] = [
+    types.ResourceTemplate(
+        name=widget.title,
+        title=widget.title,
+        uriTemplate=widget.template_uri,
+        description=_resource_description(widget),
+        mimeType=MIME_TYPE,
+        _meta=_tool_meta(widget),
+    )
+    for widget in widgets
+]
 
+
+# The listings are static, so they are built once above and shared by every call.
 @mcp._mcp_server.list_tools()
 async def _list_tools() -> List[types.Tool]:
-    return [
-        types.Tool(
-            name=widget.identifier,
-            title=widget.title,
-            description=widget.title,
-            inputSchema=deepcopy(TOOL_INPUT_SCHEMA),
-            _meta=_tool_meta(widget),
-            # To disable the approval prompt for the tools
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": False,
-                "readOnlyHint": True,
-            },
-        )
-        for widget in widgets
-    ]
+    return TOOLS
 
 
 @mcp._mcp_server.list_resources()
 async def _list_resources() -> List[types.Resource]:
-    return [
-        types.Resource(
-            name=widget.title,
-            title=widget.title,
-            uri=widget.template_uri,
-            description=_resource_description(widget),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(widget),
-        )
-        for widget in widgets
-    ]
+    return RESOURCES
 
 
 @mcp._mcp_server.list_resource_templates()
 async def _list_resource_templates() -> List[types.ResourceTemplate]:
-    return [
-        types.ResourceTemplate(
-            name=widget.title,
-            title=widget.title,
-            uriTemplate=widget.template_uri,
-            description=_resource_description(widget),
-            mimeType=MIME_TYPE,
-            _meta=_tool_meta(widget),
-        )
-        for widget in widgets
-    ]
+    return RESOURCE_TEMPLATES
 
 
 async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerResult:
@@ -290,12 +305,7 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
 
     return types.ServerResult(
         types.CallToolResult(
-            content=[
-                types.TextContent(
-                    type="text",
-                    text=widget.response_text,
-                )
-            ],
+            content=[RESPONSE_TEXT_CONTENTS[widget.identifier]],
             structuredContent={"pizzaTopping": topping},
             _meta=meta,
         )
@@ -26,9 +26,9 @@ def _load_widget_html() -> str:
     if html_path.exists():
         return html_path.read_text(encoding="utf8")
 
-    fallback = sorted(ASSETS_DIR.glob("shopping-cart-*.html"))
-    if fallback:
-        return fallback[-1].read_text(encoding="utf8")
+    fallback = max(ASSETS_DIR.glob("shopping-cart-*.html"), default=None)
+    if fallback is not None:
+        return fallback.read_text(encoding="utf8")
 
     raise FileNotFoundError(
         f'Widget HTML for "shopping-cart" not found in {ASSETS_DIR}. '
@@ -203,7 +203,7 @@ async def _handle_call_tool(req: types.CallToolRequest) -> types.ServerResult:
 
     structured_content = {
         "cartId": cart_id,
-        "items": [dict(item) for item in cart_items],
+        "items": cart_items,
     }
     meta = _widget_meta()
     meta["openai/widgetSessionId"] = cart_id
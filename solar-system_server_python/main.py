@@ -47,6 +47,11 @@ PLANET_DESCRIPTIONS = {
     "Neptune": "Neptune, the farthest known giant, is a deep-blue world with supersonic winds and a faint ring system.",
 }
 DEFAULT_PLANET = "Earth"
+# Lowercased, alphanumeric-only lookup keys, computed once instead of per request.
+PLANET_KEYS = tuple(
+    (planet, "".join(ch for ch in planet.lower() if ch.isalnum())) for planet in PLANETS
+)
+PLANETS_BY_KEY = {planet_key: planet for planet, planet_key in PLANET_KEYS}
 
 
 @dataclass(frozen=True)
@@ -69,9 +74,9 @@ def _load_widget_html(component_name: str) -> str:
     if html_path.exists():
         return html_path.read_text(encoding="utf8")
 
-    fallback_candidates = sorted(ASSETS_DIR.glob(f"{component_name}-*.html"))
-    if fallback_candidates:
-        return fallback_candidates[-1].read_text(encoding="utf8")
+    fallback_candidate = max(ASSETS_DIR.glob(f"{component_name}-*.html"), default=None)
+    if fallback_candidate is not None:
+        return fallback_candidate.read_text(encoding="utf8")
 
     raise FileNotFoundError(
         f'Widget HTML for "{component_name}" not found in {ASSETS_DIR}. '
@@ -174,17 +179,15 @@ def _normalize_planet(name: str) -> str | None:
 
     clean = "".join(ch for ch in key if ch.isalnum())
 
-    for planet in PLANETS:
-        planet_key = "".join(ch for ch in planet.lower() if ch.isalnum())
-        if clean == planet_key or key == planet.lower():
-            return planet
+    planet = PLANETS_BY_KEY.get(clean)
+    if planet:
+        return planet
 
     alias = PLANET_ALIASES.get(clean)
     if alias:
         return alias
 
-    for planet in PLANETS:
-        planet_key = "".join(ch for ch in planet.lower() if ch.isalnum())
+    for planet, planet_key in PLANET_KEYS:
         if planet_key.startswith(clean):
             return planet
 